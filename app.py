@@ -1,8 +1,11 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
 import pickle
-import plotly.graph_objects as go
-from datetime import datetime
+import re
+import warnings
+import joblib
+from functools import lru_cache
+import time
 
 # Set page config
 st.set_page_config(
@@ -33,19 +36,106 @@ st.markdown("""
 GENDER_MAP = {"Male": 0, "Female": 1}
 YES_NO_MAP = {"No": 0, "Yes": 1}
 
+# Features (lowercased) that take a plain Yes/No answer
+YESNO_RE = re.compile(
+    r"(?:is_|has_).*"
+    r"|phone_service|multiple_lines|internet_service|online_security"
+    r"|online_backup|device_protection|tech_support|streaming_(?:tv|movies)"
+    r"|paperless_billing"
+)
+
+# Static result markup and recommendations
+RESULT_BOX_TEMPLATE = """
+<div style="background-color: {color}; padding: 20px; border-radius: 10px;">
+    <h3 style="color: black;">Prediction: {prediction}</h3>
+    <p style="color: black; font-size: 18px;">
+        Churn Probability: {probability:.1%}
+    </p>
+</div>
+"""
+TIMESTAMP_TEMPLATE = """
+<p style="color: gray; font-size: 14px; margin-top: 0.5rem;">Prediction made at: {timestamp}</p>
+"""
+RECOMMENDATIONS_TEMPLATE = """
+<h3>📋 Recommendations</h3>
+<div style="background-color: {color}; color: black; padding: 16px; border-radius: 10px;">
+    {recommendations}
+</div>
+"""
+HIGH_RISK_REC = (
+    "<ul>"
+    "<li>Immediate customer engagement recommended</li>"
+    "<li>Review pricing and service plans</li>"
+    "<li>Schedule customer satisfaction survey</li>"
+    "<li>Consider offering retention incentives</li>"
+    "</ul>"
+)
+LOW_RISK_REC = (
+    "<ul>"
+    "<li>Continue monitoring customer satisfaction</li>"
+    "<li>Consider upselling opportunities</li>"
+    "<li>Maintain regular communication</li>"
+    "<li>Collect feedback for service improvement</li>"
+    "</ul>"
+)
+
+def cast_to_float32(model):
+    """Store linear model parameters as float32 to match the input row"""
+    if hasattr(model, "coef_"):
+        try:
+            model.coef_ = model.coef_.astype(np.float32)
+            model.intercept_ = np.asarray(model.intercept_, dtype=np.float32)
+        except AttributeError:
+            # Some estimators (e.g. SVC) expose coef_ as a read-only property
+            pass
+    return model
+
+def allow_ndarray_input(model, feature_names):
+    """Let a model fitted on a DataFrame take the bare ndarray input row"""
+    if not hasattr(model, "feature_names_in_"):
+        return
+    if list(model.feature_names_in_) != list(feature_names):
+        raise ValueError("Model feature names do not match the saved feature_names")
+    # The row is always laid out in training order, so sklearn's
+    # missing-feature-names warning on every prediction is just noise
+    warnings.filterwarnings(
+        "ignore",
+        message="X does not have valid feature names",
+        category=UserWarning
+    )
+
 # Load the model and encoders
 @st.cache_resource
-def load_models():
-    with open("customer_churn_model.pkl", "rb") as model_file:
-        model_data = pickle.load(model_file)
-        return model_data["model"], model_data["feature_names"]
+def load_bundle():
+    try:
+        # Model, feature names and encoders live in one artifact; memory-map
+        # its arrays instead of copying them onto the heap
+        bundle = joblib.load("customer_churn_bundle.joblib", mmap_mode="r")
+    except FileNotFoundError:
+        with open("customer_churn_model.pkl", "rb") as model_file:
+            bundle = pickle.load(model_file)
+        with open("encoders.pkl", "rb") as encoders_file:
+            bundle["encoders"] = pickle.load(encoders_file)
+    feature_names = bundle["feature_names"]
+    allow_ndarray_input(bundle["model"], feature_names)
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+    return cast_to_float32(bundle["model"]), feature_names, feature_index, bundle["encoders"]
 
 @st.cache_resource
-def load_encoders():
-    with open("encoders.pkl", "rb") as encoders_file:
-        return pickle.load(encoders_file)
+def build_encoder_maps(_encoders):
+    """Turn each label encoder into a plain class -> code lookup table"""
+    return {
+        col: {cls: i for i, cls in enumerate(encoder.classes_)}
+        for col, encoder in _encoders.items()
+    }
+
+# The gauge is display-only, so skip plotly.js hover and toolbar wiring
+GAUGE_CONFIG = {"staticPlot": True, "displayModeBar": False}
 
 def create_gauge_chart(probability):
+    # Plotly is only needed for the detailed gauge, so import it on demand
+    import plotly.graph_objects as go
+
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
         value=probability * 100,
@@ -69,27 +159,117 @@ def create_gauge_chart(probability):
     fig.update_layout(height=300)
     return fig
 
-def get_field_options(feature_name):
-    """Return appropriate options based on field name"""
-    if feature_name.lower() == 'gender':
-        return list(GENDER_MAP.keys())
-    elif any(word in feature_name.lower() for word in ['is_', 'has_', 'phone_service', 'multiple_lines', 'internet_service', 'online_security', 'online_backup', 'device_protection', 'tech_support', 'streaming_tv', 'streaming_movies', 'paperless_billing']):
-        return list(YES_NO_MAP.keys())
-    return None
-
-def convert_categorical_value(feature_name, value):
-    """Convert human-readable categorical values to numeric"""
-    if feature_name.lower() == 'gender':
-        return GENDER_MAP[value]
-    elif any(word in feature_name.lower() for word in ['is_', 'has_', 'phone_service', 'multiple_lines', 'internet_service', 'online_security', 'online_backup', 'device_protection', 'tech_support', 'streaming_tv', 'streaming_movies', 'paperless_billing']):
-        return YES_NO_MAP[value]
-    return value
+# Fixed choices and value mappings for each feature kind
+FIELD_OPTIONS = {"gender": tuple(GENDER_MAP), "yesno": tuple(YES_NO_MAP)}
+VALUE_MAPS = {"gender": GENDER_MAP, "yesno": YES_NO_MAP}
+
+@lru_cache(maxsize=None)
+def feature_kind(feature_name, encoder_names):
+    """Classify a feature as 'gender', 'yesno', 'encoder' or 'numeric'"""
+    name = feature_name.lower()
+    if name == 'gender':
+        return "gender"
+    elif YESNO_RE.fullmatch(name):
+        return "yesno"
+    elif feature_name in encoder_names:
+        return "encoder"
+    return "numeric"
+
+@lru_cache(maxsize=None)
+def field_label(feature_name):
+    """Return a human-readable label for a feature"""
+    return feature_name.replace('_', ' ').title()
+
+@st.cache_resource
+def build_widget_specs(feature_names, _encoders):
+    """Precompute (feature, label, kind, options) for every input widget"""
+    encoder_names = frozenset(_encoders)
+    specs = []
+    for feature in feature_names:
+        kind = feature_kind(feature, encoder_names)
+        if kind in FIELD_OPTIONS:
+            specs.append((feature, f"📊 {field_label(feature)}", kind, FIELD_OPTIONS[kind]))
+        elif kind == "encoder":
+            specs.append((feature, f"📊 {field_label(feature)}", kind, _encoders[feature].classes_))
+        else:
+            specs.append((feature, f"📈 {field_label(feature)}", kind, None))
+    return specs
+
+@st.cache_resource
+def build_convert_table(feature_names, encoder_names):
+    """Map each feature to its human-readable value mapping, or None"""
+    return {
+        feature: VALUE_MAPS.get(feature_kind(feature, encoder_names))
+        for feature in feature_names
+    }
+
+# Load the model artifacts once at module scope
+try:
+    model, feature_names, feature_index, encoders = load_bundle()
+    encoder_maps = build_encoder_maps(encoders)
+    encoder_names = frozenset(encoders)
+    transform_cols = tuple(
+        col for col in encoders
+        if col in feature_index and feature_kind(col, encoder_names) == "encoder"
+    )
+    widget_specs = build_widget_specs(tuple(feature_names), encoders)
+    convert_table = build_convert_table(tuple(feature_names), encoder_names)
+    MODELS_OK = True
+except FileNotFoundError:
+    MODELS_OK = False
+
+def result_panel(user_input, show_gauge):
+    """Predict churn for the submitted input and render the results"""
+    # Prepare input for prediction
+    input_data = {}
+    for feature, value in user_input.items():
+        # Convert categorical values if needed
+        input_data[feature] = mapping[value] if (mapping := convert_table[feature]) else value
+    
+    # Encode remaining categorical features that use encoders
+    for col in transform_cols:
+        input_data[col] = encoder_maps[col][input_data[col]]
+    
+    # Lay the values out in the column order used for training
+    row = np.empty((1, len(feature_names)), dtype=np.float32)
+    for feature, value in input_data.items():
+        row[0, feature_index[feature]] = value
+    
+    st.subheader("🎯 Prediction Results")
+    
+    # Make prediction
+    with st.status("Analyzing customer data...") as status:
+        probabilities = model.predict_proba(row)[0]
+        status.update(label="Analysis complete", state="complete")
+    churn_probability = probabilities[1]
+    high_risk = churn_probability > 0.5
+    prediction = "High Risk of Churn" if high_risk else "Low Risk of Churn"
+    
+    # Display churn probability
+    st.metric("Churn Probability", f"{churn_probability:.1%}")
+    st.progress(int(churn_probability * 100))
+    if show_gauge:
+        st.plotly_chart(create_gauge_chart(churn_probability), config=GAUGE_CONFIG)
+    
+    # Display prediction results, timestamp and recommendations in one go
+    html_parts = [
+        RESULT_BOX_TEMPLATE.format(
+            color="salmon" if high_risk else "lightgreen",
+            prediction=prediction,
+            probability=churn_probability
+        ),
+        TIMESTAMP_TEMPLATE.format(
+            timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
+        ),
+        RECOMMENDATIONS_TEMPLATE.format(
+            color="#fff3cd" if high_risk else "#d4edda",
+            recommendations=HIGH_RISK_REC if high_risk else LOW_RISK_REC
+        ),
+    ]
+    st.markdown("".join(html_parts), unsafe_allow_html=True)
 
 def main():
-    try:
-        model, feature_names = load_models()
-        encoders = load_encoders()
-    except FileNotFoundError:
+    if not MODELS_OK:
         st.error("❌ Model files not found. Please ensure model and encoder files are in the correct location.")
         return
 
@@ -111,26 +291,14 @@ def main():
             numerical_inputs = {}
             categorical_inputs = {}
             
-            for feature in feature_names:
-                # Check if this field should have predefined options
-                options = get_field_options(feature)
-                
+            for feature, label, kind, options in widget_specs:
                 if options is not None:
-                    # For categorical fields with predefined options
-                    categorical_inputs[feature] = st.selectbox(
-                        f"📊 {feature.replace('_', ' ').title()}",
-                        options
-                    )
-                elif feature in encoders:
-                    # For other categorical fields
-                    categorical_inputs[feature] = st.selectbox(
-                        f"📊 {feature.replace('_', ' ').title()}",
-                        encoders[feature].classes_
-                    )
+                    # For categorical fields
+                    categorical_inputs[feature] = st.selectbox(label, options)
                 else:
                     # For numerical fields
                     numerical_inputs[feature] = st.number_input(
-                        f"📈 {feature.replace('_', ' ').title()}",
+                        label,
                         min_value=0.0,
                         step=0.1,
                         format="%.2f"
@@ -139,65 +307,12 @@ def main():
             user_input.update(numerical_inputs)
             user_input.update(categorical_inputs)
             
+            show_gauge = st.toggle("Show detailed gauge")
             submit_button = st.form_submit_button("🔍 Predict Churn")
 
     with col2:
         if submit_button:
-            st.subheader("🎯 Prediction Results")
-            
-            # Show loading spinner during prediction
-            with st.spinner("Analyzing customer data..."):
-                # Prepare input for prediction
-                input_data = {}
-                for feature, value in user_input.items():
-                    # Convert categorical values if needed
-                    input_data[feature] = convert_categorical_value(feature, value)
-                
-                input_df = pd.DataFrame([input_data])
-                
-                # Encode remaining categorical features that use encoders
-                for col, encoder in encoders.items():
-                    if col in input_df and not any(word in col.lower() for word in ['gender', 'is_', 'has_', 'phone_service', 'multiple_lines', 'internet_service', 'online_security', 'online_backup', 'device_protection', 'tech_support', 'streaming_tv', 'streaming_movies', 'paperless_billing']):
-                        input_df[col] = encoder.transform(input_df[col])
-                
-                # Make prediction
-                probabilities = model.predict_proba(input_df)[0]
-                churn_probability = probabilities[1]
-                prediction = "High Risk of Churn" if churn_probability > 0.5 else "Low Risk of Churn"
-                
-                # Display gauge chart
-                st.plotly_chart(create_gauge_chart(churn_probability))
-                
-                # Display prediction results
-                result_color = "salmon" if churn_probability > 0.5 else "lightgreen"
-                st.markdown(f"""
-                    <div style="background-color: {result_color}; padding: 20px; border-radius: 10px;">
-                        <h3 style="color: black;">Prediction: {prediction}</h3>
-                        <p style="color: black; font-size: 18px;">
-                            Churn Probability: {churn_probability:.1%}
-                        </p>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Add timestamp
-                st.caption(f"Prediction made at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Recommendations based on prediction
-                st.subheader("📋 Recommendations")
-                if churn_probability > 0.5:
-                    st.warning("""
-                        - Immediate customer engagement recommended
-                        - Review pricing and service plans
-                        - Schedule customer satisfaction survey
-                        - Consider offering retention incentives
-                    """)
-                else:
-                    st.success("""
-                        - Continue monitoring customer satisfaction
-                        - Consider upselling opportunities
-                        - Maintain regular communication
-                        - Collect feedback for service improvement
-                    """)
+            result_panel(user_input, show_gauge)
 
     # Footer
     st.markdown("---")